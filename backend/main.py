@@ -1,32 +1,78 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-from typing import List, Optional, Dict, Any
-import requests
-import json
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Tuple
+import orjson
+import hashlib
+import random
 import re
 import os
 from datetime import datetime
-import sqlite3
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import aiohttp
-from urllib.parse import urlparse
+import aiosqlite
+from urllib.parse import urljoin
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from PIL import Image
+from selectolax.lexbor import LexborHTMLParser
 import io
-import base64
-from dataclasses import dataclass
 import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Precompiled extraction patterns
+_HASHTAG_RE = re.compile(r'#(\w+)')
+_RESUME_CONTACT_RE = re.compile(r'Email:\s*(?P<email>[^\s\n]+)|Phone:\s*(?P<phone>[^\n]+)')
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared database and HTTP connections on startup and close them on shutdown"""
+    # One writer task owns the write connection; WAL mode lets the readers proceed alongside it
+    write_conn = await open_connection(DB_PATH)
+    await init_database(write_conn)
+    app.state.writer = DatabaseWriter(write_conn)
+    app.state.writer.start()
+
+    app.state.read_pool = ConnectionPool(
+        [await open_connection(DB_PATH) for _ in range(DB_READ_POOL_SIZE)]
+    )
+    await app.state.read_pool.warm()
+
+    # Shared HTTP client so scrapes reuse keep-alive connections and cached DNS.
+    # All outbound HTTP goes through it; blocking clients like requests are banned (see ruff.toml)
+    app.state.http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=64, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=30)
+    )
+
+    # Build the Gemini client before the first request instead of during it
+    app.state.ai = AIService(app.state.read_pool, app.state.writer)
+    if GEMINI_WARMUP:
+        await app.state.ai.warm_up()
+    app.state.profile_service = ProfileBuilderService(app.state.http, app.state.ai, app.state.writer)
+    try:
+        yield
+    finally:
+        app.state.ai.close()
+        await app.state.http.close()
+        await app.state.read_pool.close()
+        await app.state.writer.close()
+
 # Initialize FastAPI app
-app = FastAPI(title="Smart Talent Profile Builder", version="1.0.0")
+app = FastAPI(
+    title="Smart Talent Profile Builder",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Enable CORS
 app.add_middleware(
@@ -39,15 +85,130 @@ app.add_middleware(
 
 # Configure Gemini AI
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "your-api-key")
+GEMINI_WARMUP = os.getenv("GEMINI_WARMUP", "0") == "1"
 genai.configure(api_key=GEMINI_API_KEY)
 
 # Database setup
-def init_database():
-    conn = sqlite3.connect('talent_profiles.db')
-    cursor = conn.cursor()
+DB_PATH = 'talent_profiles.db'
+# Keep writing the legacy portfolio_items table alongside profiles.portfolio_items while migrating
+PORTFOLIO_TABLE_WRITES = os.getenv("PORTFOLIO_TABLE_WRITES", "1") == "1"
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    # Worker processes each hold a writer, so wait on the file lock instead of failing
+    "PRAGMA busy_timeout=5000",
+)
+
+async def open_connection(path: str) -> aiosqlite.Connection:
+    """Open a SQLite connection with the shared PRAGMAs applied once"""
+    conn = await aiosqlite.connect(path)
+    conn.row_factory = aiosqlite.Row
+    for pragma in SQLITE_PRAGMAS:
+        await conn.execute(pragma)
+    return conn
+
+class ConnectionPool:
+    """Fixed set of read connections handed out one request at a time"""
+    def __init__(self, connections: List[aiosqlite.Connection]):
+        self._connections = connections
+        self._available: asyncio.Queue = asyncio.Queue()
+        for conn in connections:
+            self._available.put_nowait(conn)
+    
+    @asynccontextmanager
+    async def acquire(self):
+        conn = await self._available.get()
+        try:
+            yield conn
+        finally:
+            self._available.put_nowait(conn)
+    
+    async def warm(self):
+        """Touch every connection so the first requests don't pay for page-cache setup"""
+        await asyncio.gather(*(conn.execute("SELECT 1") for conn in self._connections))
+    
+    async def close(self):
+        for conn in self._connections:
+            await conn.close()
+
+MAX_WRITE_BATCH = 64
+
+class DatabaseWriter:
+    """Single task that owns the write connection and commits queued jobs in batches"""
+    def __init__(self, conn: aiosqlite.Connection):
+        self.conn = conn
+        self._jobs: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+    
+    async def submit(self, job: Callable[[aiosqlite.Connection], Awaitable[Any]]) -> Any:
+        """Queue job(conn) and wait until the transaction containing it commits"""
+        future = asyncio.get_running_loop().create_future()
+        await self._jobs.put((job, future))
+        return await future
     
+    async def close(self):
+        await self._jobs.put(None)
+        await self._task
+        await self.conn.close()
+    
+    async def _run(self):
+        while True:
+            batch = [await self._jobs.get()]
+            while len(batch) < MAX_WRITE_BATCH and not self._jobs.empty():
+                batch.append(self._jobs.get_nowait())
+            
+            stopping = None in batch
+            batch = [entry for entry in batch if entry is not None]
+            if batch:
+                try:
+                    await self._commit_batch(batch)
+                except Exception as e:
+                    # Fail this batch's callers rather than letting the writer task die with them waiting
+                    logger.error(f"Database writer error: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+            if stopping:
+                return
+    
+    async def _commit_batch(self, batch: List[Tuple[Callable, asyncio.Future]]):
+        """Run every queued job in one transaction, isolating failures with savepoints"""
+        results = []
+        try:
+            await self.conn.execute('BEGIN')
+            for job, future in batch:
+                await self.conn.execute('SAVEPOINT job')
+                try:
+                    results.append((future, await job(self.conn), None))
+                    await self.conn.execute('RELEASE job')
+                except Exception as e:
+                    await self.conn.execute('ROLLBACK TO job')
+                    await self.conn.execute('RELEASE job')
+                    results.append((future, None, e))
+            await self.conn.commit()
+        except Exception as e:
+            logger.error(f"Database write batch failed: {e}")
+            await self.conn.rollback()
+            results = [(future, None, e) for _, future in batch]
+        
+        for future, result, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+async def init_database(conn: aiosqlite.Connection):
     # Create profiles table
-    cursor.execute('''
+    await conn.execute('''
         CREATE TABLE IF NOT EXISTS profiles (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id TEXT UNIQUE NOT NULL,
@@ -59,13 +220,14 @@ def init_database():
             profession TEXT,
             skills TEXT,  -- JSON array
             social_links TEXT,  -- JSON object
+            portfolio_items TEXT,  -- JSON array of portfolio items
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
     
     # Create portfolio items table
-    cursor.execute('''
+    await conn.execute('''
         CREATE TABLE IF NOT EXISTS portfolio_items (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             profile_id INTEGER,
@@ -80,11 +242,53 @@ def init_database():
         )
     ''')
     
-    conn.commit()
-    conn.close()
+    await migrate_portfolio_column(conn)
+    
+    await conn.execute('CREATE INDEX IF NOT EXISTS idx_profiles_created_at ON profiles (created_at DESC)')
+    await conn.execute('CREATE INDEX IF NOT EXISTS idx_portfolio_profile_id ON portfolio_items (profile_id)')
+    
+    # Create AI response cache table
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS ai_cache (
+            prompt_hash TEXT PRIMARY KEY,  -- SHA-256 of model + prompt
+            response TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    await conn.commit()
+
+async def migrate_portfolio_column(conn: aiosqlite.Connection):
+    """Add profiles.portfolio_items to older databases and backfill it from the portfolio_items table"""
+    # Worker processes start together; take the write lock before checking so only one migrates
+    await conn.execute('BEGIN IMMEDIATE')
+    try:
+        cursor = await conn.execute('PRAGMA table_info(profiles)')
+        columns = {row["name"] for row in await cursor.fetchall()}
+        if "portfolio_items" not in columns:
+            await conn.execute('ALTER TABLE profiles ADD COLUMN portfolio_items TEXT')
+            await backfill_portfolio_column(conn)
+        await conn.commit()
+    except Exception:
+        await conn.rollback()
+        raise
 
-# Initialize database on startup
-init_database()
+async def backfill_portfolio_column(conn: aiosqlite.Connection):
+    """Fill profiles.portfolio_items from the legacy portfolio_items table"""
+    await conn.execute('''
+        UPDATE profiles SET portfolio_items = (
+            SELECT json_group_array(json_object(
+                'title', title,
+                'description', description,
+                'media_type', media_type,
+                'media_url', media_url,
+                'tags', json(COALESCE(tags, '[]')),
+                'ai_analysis', json(COALESCE(ai_analysis, '{}')),
+                'created_at', created_at
+            ))
+            FROM (SELECT * FROM portfolio_items WHERE profile_id = profiles.id ORDER BY id)
+        )
+    ''')
 
 # Pydantic models
 class ProfileImportRequest(BaseModel):
@@ -92,6 +296,9 @@ class ProfileImportRequest(BaseModel):
     sources: List[str]  
     source_types: List[str]  
 
+class ProfileBatchImportRequest(BaseModel):
+    profiles: List[ProfileImportRequest]
+
 class ProfileResponse(BaseModel):
     user_id: str
     name: Optional[str]
@@ -103,14 +310,144 @@ class ProfileResponse(BaseModel):
     portfolio_items: List[Dict[str, Any]]
 
 # AI Services
+GEMINI_MODEL = 'gemini-1.5-flash'
+DEFAULT_BIO = "Creative professional with diverse skills and experience."
+
+# Client-side deadline profiles. These only set the request timeout and retry policy;
+# every call is an ordinary generate_content request with the same pricing and priority.
+GEMINI_DEADLINES = {
+    "interactive": 30,
+    "standard": 60,
+    "background": 900,
+}
+# Background calls retry overload errors with exponential backoff
+GEMINI_RETRY_DEADLINES = {"background"}
+GEMINI_RETRY_ATTEMPTS = 4
+GEMINI_RETRY_BASE_DELAY = 2.0
+GEMINI_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+
+# Response schemas for Gemini JSON mode, so replies always parse
+SKILLS_SCHEMA = {"type": "array", "items": {"type": "string"}}
+IMAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "content_type": {"type": "string"},
+        "subjects": {"type": "array", "items": {"type": "string"}},
+        "quality": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "category": {"type": "string"},
+    },
+    "required": ["content_type", "subjects", "quality", "tags", "category"],
+}
+
+def bulk_enrich_schema(source_types) -> Dict[str, Any]:
+    """Response schema with one skills array per source section plus the bio"""
+    properties = {f"skills_{source_type}": SKILLS_SCHEMA for source_type in source_types}
+    properties["bio"] = {"type": "string"}
+    return {"type": "object", "properties": properties, "required": list(properties)}
+
+def parse_json_object(text: str, required: List[str]) -> Dict[str, Any]:
+    """Parse a JSON-mode reply, rejecting anything but an object with the required keys"""
+    value = orjson.loads(text)
+    if not isinstance(value, dict):
+        raise ValueError(f"Expected a JSON object, got {type(value).__name__}")
+    missing = [key for key in required if key not in value]
+    if missing:
+        raise ValueError(f"Reply is missing keys: {', '.join(missing)}")
+    return value
+
 class AIService:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, read_pool: ConnectionPool, writer: DatabaseWriter):
+        # Response cache lives in the ai_cache table
+        self.read_pool = read_pool
+        self.writer = writer
+        self.model = genai.GenerativeModel(GEMINI_MODEL)
+        # Image decoding runs here so it doesn't block the event loop
+        self._pool = ThreadPoolExecutor(max_workers=4)
     
-    async def analyze_image(self, image_data: bytes) -> Dict[str, Any]:
+    def close(self):
+        self._pool.shutdown(wait=False)
+    
+    async def warm_up(self):
+        """Open the Gemini channel with a free count_tokens call"""
+        try:
+            await asyncio.wait_for(self.model.count_tokens_async("warmup"), timeout=10)
+        except Exception as e:
+            logger.warning(f"Gemini warmup failed: {e}")
+    
+    async def generate(self, contents, *, deadline: str, schema: Optional[Dict[str, Any]] = None,
+                       parse: Callable[[str], Any] = str.strip,
+                       cache_material: Optional[bytes] = None, refresh: bool = False) -> Any:
+        """Return parse(response text) for contents under the given deadline profile, cached by content hash.
+        
+        With a schema the model runs in JSON mode. Only replies that parse are cached;
+        refresh skips the cache lookup and replaces the stored reply.
+        """
+        if deadline not in GEMINI_DEADLINES:
+            raise ValueError(f"Unknown deadline profile: {deadline}")
+        if cache_material is None:
+            cache_material = contents.encode()
+        generation_config = None
+        if schema is not None:
+            generation_config = {"response_mime_type": "application/json", "response_schema": schema}
+            cache_material += b"\0" + orjson.dumps(schema, option=orjson.OPT_SORT_KEYS)
+        prompt_hash = hashlib.sha256(GEMINI_MODEL.encode() + b"\0" + cache_material).hexdigest()
+        
+        cached = None if refresh else await self._cache_get(prompt_hash)
+        if cached is not None:
+            try:
+                return parse(cached)
+            except Exception as e:
+                logger.warning(f"Discarding unparseable cached Gemini reply: {e}")
+        
+        attempts = GEMINI_RETRY_ATTEMPTS if deadline in GEMINI_RETRY_DEADLINES else 1
+        for attempt in range(attempts):
+            try:
+                response = await self.model.generate_content_async(
+                    contents,
+                    generation_config=generation_config,
+                    request_options={"timeout": GEMINI_DEADLINES[deadline]}
+                )
+                break
+            except GEMINI_RETRYABLE_ERRORS as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = GEMINI_RETRY_BASE_DELAY * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning(f"Gemini {deadline} request failed ({e}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        text = response.text
+        result = parse(text)
+        await self._cache_put(prompt_hash, text)
+        return result
+    
+    async def _cache_get(self, prompt_hash: str) -> Optional[str]:
+        async with self.read_pool.acquire() as conn:
+            cursor = await conn.execute('SELECT response FROM ai_cache WHERE prompt_hash = ?', (prompt_hash,))
+            row = await cursor.fetchone()
+        return row["response"] if row else None
+    
+    async def _cache_put(self, prompt_hash: str, response: str):
+        # A failed cache write must not throw away a reply that was already paid for
+        try:
+            await self.writer.submit(lambda conn: conn.execute(
+                'INSERT OR REPLACE INTO ai_cache (prompt_hash, response) VALUES (?, ?)',
+                (prompt_hash, response)
+            ))
+        except Exception as e:
+            logger.warning(f"AI cache write failed: {e}")
+    
+    async def analyze_image(self, image_data: bytes, *, deadline: str = "standard",
+                            refresh: bool = False) -> Dict[str, Any]:
         """Analyze image content using Gemini Vision"""
         try:
-            image = Image.open(io.BytesIO(image_data))
+            loop = asyncio.get_running_loop()
+            image = await loop.run_in_executor(
+                self._pool, lambda: Image.open(io.BytesIO(image_data)).convert("RGB")
+            )
             
             prompt = """
             Analyze this image and provide:
@@ -123,69 +460,49 @@ class AIService:
             Return as JSON format with keys: content_type, subjects, quality, tags, category
             """
             
-            response = self.model.generate_content([prompt, image])
-            
-            try:
-                return json.loads(response.text)
-            except:
-                return {
-                    "content_type": "unknown",
-                    "subjects": [],
-                    "quality": "medium",
-                    "tags": [],
-                    "category": "general"
-                }
+            return await self.generate(
+                [prompt, image], deadline=deadline, schema=IMAGE_SCHEMA,
+                parse=lambda text: parse_json_object(text, IMAGE_SCHEMA["required"]),
+                cache_material=prompt.encode() + image_data, refresh=refresh
+            )
         except Exception as e:
             logger.error(f"Image analysis error: {e}")
             return {"error": str(e)}
     
-    async def generate_bio(self, profile_data: Dict[str, Any]) -> str:
-        """Generate professional bio using Gemini"""
-        try:
-            prompt = f"""
-            Create a professional bio for a creative professional based on this information:
-            
-            Name: {profile_data.get('name', 'Unknown')}
-            Profession: {profile_data.get('profession', 'Creative Professional')}
-            Skills: {', '.join(profile_data.get('skills', []))}
-            Portfolio highlights: {profile_data.get('portfolio_summary', 'Various creative works')}
-            
-            Make it engaging, professional, and 2-3 sentences long. Focus on their creative expertise and unique value.
-            """
-            
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            logger.error(f"Bio generation error: {e}")
-            return "Creative professional with diverse skills and experience."
-    
-    async def extract_skills(self, text: str) -> List[str]:
-        """Extract skills from text using Gemini"""
+    async def bulk_enrich(self, profile_inputs: Dict[str, Any], *, deadline: str = "standard") -> Dict[str, Any]:
+        """Extract skills for every source and write the bio in one Gemini call"""
+        texts = profile_inputs.get("texts", {})
+        sections = "\n\n".join(f"[{source_type}]\n{text}" for source_type, text in texts.items())
+        skill_keys = ", ".join(f'"skills_{source_type}"' for source_type in texts) or "none"
+        
         try:
             prompt = f"""
-            Extract professional skills and competencies from this text:
+            Enrich the profile of a creative professional from the information below.
             
-            {text}
+            Name: {profile_inputs.get('name') or 'Unknown'}
+            Profession: {profile_inputs.get('profession') or 'Creative Professional'}
+            Known skills: {', '.join(profile_inputs.get('skills', []))}
+            Portfolio highlights: {profile_inputs.get('portfolio_summary') or 'Various creative works'}
             
-            Return only a JSON array of skills, focusing on:
-            - Technical skills
-            - Creative skills
-            - Software proficiency
-            - Industry expertise
+            Source sections:
+            {sections}
             
-            Example: ["Photography", "Adobe Photoshop", "Portrait Photography", "Digital Marketing"]
+            Return only a JSON object with these keys:
+            - One key per source section ({skill_keys}): a JSON array of the professional skills
+              and competencies found in that section (technical skills, creative skills,
+              software proficiency, industry expertise)
+            - "bio": an engaging, professional bio 2-3 sentences long, focused on their creative
+              expertise and unique value
             """
             
-            response = self.model.generate_content(prompt)
-            
-            try:
-                skills = json.loads(response.text)
-                return skills if isinstance(skills, list) else []
-            except:
-                return [skill.strip() for skill in response.text.split(',') if skill.strip()]
+            schema = bulk_enrich_schema(texts)
+            return await self.generate(
+                prompt, deadline=deadline, schema=schema,
+                parse=lambda text: parse_json_object(text, schema["required"])
+            )
         except Exception as e:
-            logger.error(f"Skill extraction error: {e}")
-            return []
+            logger.error(f"Bulk enrichment error: {e}")
+            return {}
 
 # Data Sources
 class InstagramScraper:
@@ -240,51 +557,73 @@ class LinkedInScraper:
             "skills": ["Photography", "Adobe Creative Suite", "Portrait Photography", "Commercial Photography"]
         }
 
+MAX_PAGE_BYTES = 512 * 1024
+
 class WebsiteScraper:
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+    
     async def scrape_website(self, url: str) -> Dict[str, Any]:
         """Basic website scraping for portfolio sites"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        return {
-                            "title": self._extract_title(content),
-                            "description": self._extract_description(content),
-                            "images": self._extract_images(content, url),
-                            "content": content[:1000]  
-                        }
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    content = await self._read_page(response)
+                    tree = LexborHTMLParser(content)
+                    return {
+                        "title": self._extract_title(tree),
+                        "description": self._extract_description(tree),
+                        "images": self._extract_images(tree, url),
+                        "content": content[:1000]  
+                    }
         except Exception as e:
             logger.error(f"Website scraping error: {e}")
         
         return {"error": "Failed to scrape website"}
     
-    def _extract_title(self, html: str) -> str:
-        match = re.search(r'<title>(.*?)</title>', html, re.IGNORECASE)
-        return match.group(1) if match else "Unknown"
-    
-    def _extract_description(self, html: str) -> str:
-        match = re.search(r'<meta name="description" content="(.*?)"', html, re.IGNORECASE)
-        return match.group(1) if match else ""
-    
-    def _extract_images(self, html: str, base_url: str) -> List[str]:
-        images = re.findall(r'<img[^>]+src="([^"]+)"', html, re.IGNORECASE)
-        base_domain = urlparse(base_url).netloc
-        absolute_images = []
-        for img in images[:10]:  
-            if img.startswith('http'):
-                absolute_images.append(img)
-            elif img.startswith('/'):
-                absolute_images.append(f"https://{base_domain}{img}")
-        return absolute_images
+    async def _read_page(self, response: aiohttp.ClientResponse) -> str:
+        """Stream the body up to MAX_PAGE_BYTES and decode it once"""
+        buf = bytearray()
+        async for chunk in response.content.iter_chunked(16384):
+            buf.extend(chunk)
+            if len(buf) >= MAX_PAGE_BYTES:
+                break
+        
+        try:
+            return buf[:MAX_PAGE_BYTES].decode(response.charset or 'utf-8', errors='replace')
+        except LookupError:
+            return buf[:MAX_PAGE_BYTES].decode('utf-8', errors='replace')
+    
+    def _extract_title(self, tree: LexborHTMLParser) -> str:
+        node = tree.css_first('title')
+        return node.text(strip=True) if node else "Unknown"
+    
+    def _extract_description(self, tree: LexborHTMLParser) -> str:
+        node = tree.css_first('meta[name="description"]')
+        return (node.attributes.get('content') or "") if node else ""
+    
+    def _extract_images(self, tree: LexborHTMLParser, base_url: str) -> List[str]:
+        images = (node.attributes.get('src') for node in tree.css('img[src]'))
+        # Resolve against the page URL, then drop repeats while keeping page order
+        absolute_images = dict.fromkeys(urljoin(base_url, img) for img in images if img)
+        return list(absolute_images)[:10]
 
 # Main Profile Builder Service
+MAX_CONCURRENT_FETCHES = int(os.getenv("MAX_CONCURRENT_FETCHES", "16"))
+IMAGE_ANALYSIS_CONCURRENCY = int(os.getenv("IMAGE_ANALYSIS_CONCURRENCY", "8"))
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+
 class ProfileBuilderService:
-    def __init__(self):
-        self.ai_service = AIService()
+    def __init__(self, http: aiohttp.ClientSession, ai_service: AIService, writer: DatabaseWriter):
+        self.http = http
+        self.ai_service = ai_service
+        self.writer = writer
         self.instagram_scraper = InstagramScraper()
         self.linkedin_scraper = LinkedInScraper()
-        self.website_scraper = WebsiteScraper()
+        self.website_scraper = WebsiteScraper(http)
+        self._fetch_slots = asyncio.BoundedSemaphore(MAX_CONCURRENT_FETCHES)
+        # Shared across all profiles so batch imports can't multiply Gemini image calls
+        self._image_slots = asyncio.BoundedSemaphore(IMAGE_ANALYSIS_CONCURRENCY)
     
     async def build_profile(self, request: ProfileImportRequest) -> Dict[str, Any]:
         """Main method to build profile from multiple sources"""
@@ -298,38 +637,62 @@ class ProfileBuilderService:
             "social_links": {},
             "portfolio_items": []
         }
+        # Text collected per source for the single enrichment call
+        ai_inputs = {"texts": {}, "experience": ""}
+
+        sources = list(zip(request.sources, request.source_types))
 
-        for source, source_type in zip(request.sources, request.source_types):
+        # Fetch all sources concurrently, then merge serially in request order
+        results = await asyncio.gather(
+            *(self._fetch_source(source, source_type) for source, source_type in sources),
+            return_exceptions=True
+        )
+
+        for (source, source_type), data in zip(sources, results):
             try:
+                if isinstance(data, Exception):
+                    raise data
+                
                 if source_type == "instagram":
-                    username = source.split('/')[-1] if '/' in source else source
-                    data = await self.instagram_scraper.scrape_profile(username)
-                    await self._process_instagram_data(profile_data, data, source)
+                    await self._process_instagram_data(profile_data, ai_inputs, data, source)
                 
                 elif source_type == "linkedin":
-                    data = await self.linkedin_scraper.scrape_profile(source)
-                    await self._process_linkedin_data(profile_data, data)
+                    await self._process_linkedin_data(profile_data, ai_inputs, data)
                 
                 elif source_type == "website":
-                    data = await self.website_scraper.scrape_website(source)
-                    await self._process_website_data(profile_data, data, source)
+                    await self._process_website_data(profile_data, ai_inputs, data, source)
                 
                 elif source_type == "resume":
                     # Handle resume files (PDF, DOC)
-                    await self._process_resume_data(profile_data, source)
+                    await self._process_resume_data(profile_data, ai_inputs, source)
                 
             except Exception as e:
                 logger.error(f"Error processing {source_type} source: {e}")
         
         # AI Enhancement
-        await self._enhance_with_ai(profile_data)
+        await self._enhance_with_ai(profile_data, ai_inputs)
         
         # Save to database
         await self._save_profile(profile_data)
         
         return profile_data
     
-    async def _process_instagram_data(self, profile_data: Dict, data: Dict, source: str):
+    async def _fetch_source(self, source: str, source_type: str) -> Optional[Dict[str, Any]]:
+        """Fetch raw data for a single source, capped by the shared fetch slots"""
+        async with self._fetch_slots:
+            if source_type == "instagram":
+                username = source.split('/')[-1] if '/' in source else source
+                return await self.instagram_scraper.scrape_profile(username)
+            
+            elif source_type == "linkedin":
+                return await self.linkedin_scraper.scrape_profile(source)
+            
+            elif source_type == "website":
+                return await self.website_scraper.scrape_website(source)
+        
+        return None
+    
+    async def _process_instagram_data(self, profile_data: Dict, ai_inputs: Dict, data: Dict, source: str):
         """Process Instagram data"""
         if not profile_data["name"]:
             profile_data["name"] = data.get("name", "").replace("@", "")
@@ -341,8 +704,7 @@ class ProfileBuilderService:
         combined_text = f"{bio_text} {captions}"
         
         if combined_text:
-            skills = await self.ai_service.extract_skills(combined_text)
-            profile_data["skills"].extend(skills)
+            self._add_ai_text(ai_inputs, "instagram", combined_text)
         
         # Add portfolio items from posts
         for post in data.get("recent_posts", []):
@@ -356,7 +718,7 @@ class ProfileBuilderService:
             }
             profile_data["portfolio_items"].append(portfolio_item)
     
-    async def _process_linkedin_data(self, profile_data: Dict, data: Dict):
+    async def _process_linkedin_data(self, profile_data: Dict, ai_inputs: Dict, data: Dict):
         """Process LinkedIn data"""
         if not profile_data["name"]:
             profile_data["name"] = data.get("name")
@@ -368,30 +730,23 @@ class ProfileBuilderService:
         linkedin_skills = data.get("skills", [])
         profile_data["skills"].extend(linkedin_skills)
         
-        # Generate bio from experience
+        # Experience feeds the generated bio
         experience_text = " ".join([
             f"{exp.get('title')} at {exp.get('company')}: {exp.get('description', '')}"
             for exp in data.get("experience", [])
         ])
         
         if experience_text:
-            bio = await self.ai_service.generate_bio({
-                "name": profile_data["name"],
-                "profession": profile_data["profession"],
-                "skills": profile_data["skills"],
-                "portfolio_summary": experience_text
-            })
-            profile_data["bio"] = bio
+            ai_inputs["experience"] = experience_text
     
-    async def _process_website_data(self, profile_data: Dict, data: Dict, source: str):
+    async def _process_website_data(self, profile_data: Dict, ai_inputs: Dict, data: Dict, source: str):
         """Process website data"""
         if "error" not in data:
             profile_data["social_links"]["website"] = source
             
             content = data.get("content", "")
             if content:
-                skills = await self.ai_service.extract_skills(content)
-                profile_data["skills"].extend(skills)
+                self._add_ai_text(ai_inputs, "website", content)
 
             for img_url in data.get("images", []):
                 portfolio_item = {
@@ -404,7 +759,7 @@ class ProfileBuilderService:
                 }
                 profile_data["portfolio_items"].append(portfolio_item)
     
-    async def _process_resume_data(self, profile_data: Dict, file_path: str):
+    async def _process_resume_data(self, profile_data: Dict, ai_inputs: Dict, file_path: str):
         """Process resume file (mock implementation)"""
         mock_resume_text = """
         John Doe - Creative Director & Photographer
@@ -418,54 +773,163 @@ class ProfileBuilderService:
         Skills: Photography, Adobe Creative Suite, Video Editing, Brand Design
         """
         
-        # Extract contact info
-        email_match = re.search(r'Email:\s*([^\s\n]+)', mock_resume_text)
-        if email_match:
-            profile_data["email"] = email_match.group(1)
+        # Extract contact info in a single scan; the first match of each wins
+        contacts = {}
+        for match in _RESUME_CONTACT_RE.finditer(mock_resume_text):
+            for field, value in match.groupdict().items():
+                if value and field not in contacts:
+                    contacts[field] = value.strip()
         
-        phone_match = re.search(r'Phone:\s*([^\n]+)', mock_resume_text)
-        if phone_match:
-            profile_data["phone"] = phone_match.group(1).strip()
+        if "email" in contacts:
+            profile_data["email"] = contacts["email"]
+        if "phone" in contacts:
+            profile_data["phone"] = contacts["phone"]
         
-        # Extract skills
-        skills = await self.ai_service.extract_skills(mock_resume_text)
-        profile_data["skills"].extend(skills)
+        # Skills are extracted later in the bulk enrichment call
+        self._add_ai_text(ai_inputs, "resume", mock_resume_text)
+    
+    def _add_ai_text(self, ai_inputs: Dict, source_type: str, text: str):
+        """Queue source text for skill extraction"""
+        texts = ai_inputs["texts"]
+        texts[source_type] = f"{texts[source_type]} {text}" if source_type in texts else text
     
-    async def _enhance_with_ai(self, profile_data: Dict):
+    async def _enhance_with_ai(self, profile_data: Dict, ai_inputs: Dict):
         """Enhance profile with AI-generated content"""
-        profile_data["skills"] = list(set(profile_data["skills"]))
+        profile_data["skills"] = self._dedupe(profile_data["skills"])
+        wants_bio = bool(ai_inputs["experience"] or profile_data["skills"] or ai_inputs["texts"])
+
+        if wants_bio:
+            enrichment = await self.ai_service.bulk_enrich({
+                "name": profile_data["name"],
+                "profession": profile_data["profession"],
+                "skills": profile_data["skills"],
+                "portfolio_summary": ai_inputs["experience"],
+                "texts": ai_inputs["texts"]
+            }, deadline="interactive")
+            for source_type in ai_inputs["texts"]:
+                skills = enrichment.get(f"skills_{source_type}", [])
+                if isinstance(skills, list):
+                    profile_data["skills"].extend(skills)
+            profile_data["bio"] = enrichment.get("bio") or DEFAULT_BIO
 
-        if not profile_data["bio"] and profile_data["skills"]:
-            profile_data["bio"] = await self.ai_service.generate_bio(profile_data)
+        profile_data["skills"] = self._dedupe(profile_data["skills"])
+
+        image_items = [
+            item for item in profile_data["portfolio_items"]
+            if item["media_type"] == "image" and item["media_url"]
+        ]
+        # Tags and analyses are returned in the import response, so no long background deadline here
+        analyses = await self._analyze_images(image_items, deadline="standard")
+        for item, analysis in zip(image_items, analyses):
+            if analysis:
+                item["ai_analysis"] = orjson.dumps(analysis).decode()
+                tags = analysis.get("tags", [])
+                if isinstance(tags, list):
+                    item["tags"].extend(tags)
 
         for item in profile_data["portfolio_items"]:
-            if item["media_type"] == "image" and item["media_url"]:
-                try:
-                    # Mock image analysis (in real implementation, download and analyze)
-                    analysis = {
-                        "content_type": "photography",
-                        "subjects": ["portrait", "professional"],
-                        "quality": "high",
-                        "tags": ["professional", "portrait", "creative"],
-                        "category": "photography"
-                    }
-                    item["ai_analysis"] = json.dumps(analysis)
-                    item["tags"].extend(analysis["tags"])
-                except Exception as e:
-                    logger.error(f"Image analysis failed: {e}")
+            item["tags"] = self._dedupe(item["tags"])
+    
+    async def reanalyze_portfolio(self, profile_id: int, items: List[Dict[str, Any]]):
+        """Re-run image analysis for stored portfolio items and write the results back"""
+        # Bypass the AI cache, which would otherwise return the stored analysis unchanged
+        analyses = await self._analyze_images(items, deadline="background", refresh=True)
+        updates = [
+            (item, orjson.dumps(analysis).decode())
+            for item, analysis in zip(items, analyses)
+            if analysis
+        ]
+        
+        async def write(conn: aiosqlite.Connection):
+            # A re-import replaces the profile row, so stale results match nothing
+            await conn.executemany(
+                'UPDATE profiles SET portfolio_items = json_set(portfolio_items, ?, json(?)) WHERE id = ?',
+                [(f'$[{item["index"]}].ai_analysis', analysis, profile_id) for item, analysis in updates]
+            )
+            if PORTFOLIO_TABLE_WRITES:
+                await conn.executemany(
+                    'UPDATE portfolio_items SET ai_analysis = ? WHERE profile_id = ? AND media_url = ?',
+                    [(analysis, profile_id, item["media_url"]) for item, analysis in updates]
+                )
+        
+        if updates:
+            await self.writer.submit(write)
+    
+    async def _analyze_images(self, items: List[Dict[str, Any]], *, deadline: str,
+                              refresh: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """Download and analyze item images concurrently; None marks a failed item"""
+        async def analyze(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with self._image_slots:
+                image_data = await self._download_image(item["media_url"])
+                analysis = await self.ai_service.analyze_image(image_data, deadline=deadline, refresh=refresh)
+            if "error" in analysis:
+                raise ValueError(analysis["error"])
+            return analysis
+        
+        results = await asyncio.gather(*(analyze(item) for item in items), return_exceptions=True)
+        
+        analyses = []
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                logger.error(f"Image analysis failed for {item['media_url']}: {result}")
+                analyses.append(None)
+            else:
+                analyses.append(result)
+        return analyses
+    
+    async def _download_image(self, url: str) -> bytes:
+        """Download image bytes through the shared HTTP session, rejecting non-images and anything over MAX_IMAGE_BYTES"""
+        async with self.http.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            response.raise_for_status()
+            if not response.content_type.startswith("image/"):
+                raise ValueError(f"Not an image: {response.content_type}")
+            if response.content_length is not None and response.content_length > MAX_IMAGE_BYTES:
+                raise ValueError(f"Image too large: {response.content_length} bytes")
+            
+            buf = bytearray()
+            async for chunk in response.content.iter_chunked(65536):
+                buf.extend(chunk)
+                if len(buf) > MAX_IMAGE_BYTES:
+                    raise ValueError(f"Image larger than {MAX_IMAGE_BYTES} bytes")
+            return bytes(buf)
+    
+    def _dedupe(self, terms: List[str]) -> List[str]:
+        """Drop blank and case-insensitive duplicate terms, keeping the first spelling in order"""
+        seen = {}
+        for term in terms:
+            if isinstance(term, str) and term.strip():
+                seen.setdefault(term.strip().casefold(), term.strip())
+        return list(seen.values())
     
     def _extract_hashtags(self, text: str) -> List[str]:
         """Extract hashtags from text"""
-        return re.findall(r'#(\w+)', text)
+        return _HASHTAG_RE.findall(text)
     
     async def _save_profile(self, profile_data: Dict):
         """Save profile to database"""
-        conn = sqlite3.connect('talent_profiles.db')
-        cursor = conn.cursor()
-        cursor.execute('''
+        await self.writer.submit(lambda conn: self._write_profile(conn, profile_data))
+    
+    async def _write_profile(self, conn: aiosqlite.Connection, profile_data: Dict):
+        """Write the profile, with its portfolio as one JSON column, on the writer connection"""
+        saved_at = datetime.now().isoformat()
+        portfolio = [
+            {
+                "title": item.get("title"),
+                "description": item.get("description"),
+                "media_type": item.get("media_type"),
+                "media_url": item.get("media_url"),
+                "tags": item.get("tags", []),
+                "ai_analysis": orjson.loads(item["ai_analysis"]) if item.get("ai_analysis") else {},
+                "source": item.get("source"),
+                "created_at": saved_at
+            }
+            for item in profile_data["portfolio_items"]
+        ]
+        
+        cursor = await conn.execute('''
             INSERT OR REPLACE INTO profiles 
-            (user_id, name, bio, email, phone, location, profession, skills, social_links, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (user_id, name, bio, email, phone, location, profession, skills, social_links, portfolio_items, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             profile_data["user_id"],
             profile_data.get("name"),
@@ -474,34 +938,35 @@ class ProfileBuilderService:
             profile_data.get("phone"),
             profile_data.get("location"),
             profile_data.get("profession"),
-            json.dumps(profile_data.get("skills", [])),
-            json.dumps(profile_data.get("social_links", {})),
-            datetime.now().isoformat()
+            orjson.dumps(profile_data.get("skills", [])).decode(),
+            orjson.dumps(profile_data.get("social_links", {})).decode(),
+            orjson.dumps(portfolio).decode(),
+            saved_at
         ))
         
+        if not PORTFOLIO_TABLE_WRITES:
+            return
+        
         profile_id = cursor.lastrowid
         
-        # Save portfolio items
-        for item in profile_data["portfolio_items"]:
-            cursor.execute('''
-                INSERT INTO portfolio_items 
-                (profile_id, title, description, media_type, media_url, tags, ai_analysis)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        # Save portfolio items to the legacy table
+        rows = [
+            (
                 profile_id,
                 item.get("title"),
                 item.get("description"),
                 item.get("media_type"),
                 item.get("media_url"),
-                json.dumps(item.get("tags", [])),
+                orjson.dumps(item.get("tags", [])).decode(),
                 item.get("ai_analysis")
-            ))
-        
-        conn.commit()
-        conn.close()
-
-# Initialize service
-profile_service = ProfileBuilderService()
+            )
+            for item in profile_data["portfolio_items"]
+        ]
+        await conn.executemany('''
+            INSERT INTO portfolio_items 
+            (profile_id, title, description, media_type, media_url, tags, ai_analysis)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
 
 # API Endpoints
 @app.get("/")
@@ -512,7 +977,7 @@ async def root():
 async def import_profile(request: ProfileImportRequest):
     """Import and build profile from external sources"""
     try:
-        profile = await profile_service.build_profile(request)
+        profile = await app.state.profile_service.build_profile(request)
         return {
             "success": True,
             "message": "Profile imported successfully",
@@ -522,88 +987,143 @@ async def import_profile(request: ProfileImportRequest):
         logger.error(f"Profile import error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Upper bound on profiles per batch import; each one fans out scrapes and Gemini calls
+MAX_IMPORT_BATCH = int(os.getenv("MAX_IMPORT_BATCH", "20"))
+
+@app.post("/import-profile-batch", response_model=Dict[str, Any])
+async def import_profile_batch(request: ProfileBatchImportRequest):
+    """Import several profiles in one request, reporting success per profile"""
+    if len(request.profiles) > MAX_IMPORT_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_IMPORT_BATCH} profiles per batch")
+    
+    # Builds run concurrently and their saves share the writer's batched commits
+    results = await asyncio.gather(
+        *(app.state.profile_service.build_profile(profile) for profile in request.profiles),
+        return_exceptions=True
+    )
+    
+    statuses = []
+    for profile, result in zip(request.profiles, results):
+        if isinstance(result, Exception):
+            logger.error(f"Profile import error for {profile.user_id}: {result}")
+            statuses.append({"user_id": profile.user_id, "success": False, "error": str(result)})
+        else:
+            statuses.append({"user_id": profile.user_id, "success": True})
+    
+    return {
+        "success": all(status["success"] for status in statuses),
+        "message": f"Imported {sum(status['success'] for status in statuses)}/{len(statuses)} profiles",
+        "data": statuses
+    }
+
 @app.get("/profile/{user_id}")
 async def get_profile(user_id: str):
     """Get profile by user ID"""
-    conn = sqlite3.connect('talent_profiles.db')
-    cursor = conn.cursor()
-    
-    # Get profile
-    cursor.execute('SELECT * FROM profiles WHERE user_id = ?', (user_id,))
-    profile_row = cursor.fetchone()
+    async with app.state.read_pool.acquire() as conn:
+        # Get profile
+        cursor = await conn.execute('''
+            SELECT user_id, name, bio, email, phone, location, profession,
+                   skills, social_links, portfolio_items, created_at, updated_at
+            FROM profiles WHERE user_id = ?
+        ''', (user_id,))
+        profile_row = await cursor.fetchone()
     
     if not profile_row:
         raise HTTPException(status_code=404, detail="Profile not found")
     
-    # Get portfolio items
-    cursor.execute('SELECT * FROM portfolio_items WHERE profile_id = ?', (profile_row[0],))
-    portfolio_rows = cursor.fetchall()
-    
-    conn.close()
+    portfolio = orjson.loads(profile_row["portfolio_items"] or "[]")
     
     # Format response
     profile = {
-        "user_id": profile_row[1],
-        "name": profile_row[2],
-        "bio": profile_row[3],
-        "email": profile_row[4],
-        "phone": profile_row[5],
-        "location": profile_row[6],
-        "profession": profile_row[7],
-        "skills": json.loads(profile_row[8] or "[]"),
-        "social_links": json.loads(profile_row[9] or "{}"),
-        "created_at": profile_row[10],
-        "updated_at": profile_row[11],
+        "user_id": profile_row["user_id"],
+        "name": profile_row["name"],
+        "bio": profile_row["bio"],
+        "email": profile_row["email"],
+        "phone": profile_row["phone"],
+        "location": profile_row["location"],
+        "profession": profile_row["profession"],
+        "skills": orjson.loads(profile_row["skills"] or "[]"),
+        "social_links": orjson.loads(profile_row["social_links"] or "{}"),
+        "created_at": profile_row["created_at"],
+        "updated_at": profile_row["updated_at"],
+        # Item ids are positions within the profile's portfolio
         "portfolio_items": [
             {
-                "id": row[0],
-                "title": row[2],
-                "description": row[3],
-                "media_type": row[4],
-                "media_url": row[5],
-                "tags": json.loads(row[6] or "[]"),
-                "ai_analysis": json.loads(row[7] or "{}") if row[7] else {},
-                "created_at": row[8]
+                "id": index,
+                "title": item.get("title"),
+                "description": item.get("description"),
+                "media_type": item.get("media_type"),
+                "media_url": item.get("media_url"),
+                "tags": item.get("tags") or [],
+                "ai_analysis": item.get("ai_analysis") or {},
+                "created_at": item.get("created_at")
             }
-            for row in portfolio_rows
+            for index, item in enumerate(portfolio)
         ]
     }
     
     return {"success": True, "data": profile}
 
 @app.get("/profiles")
-async def list_profiles():
-    """List all profiles"""
-    conn = sqlite3.connect('talent_profiles.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT user_id, name, profession, skills, created_at FROM profiles ORDER BY created_at DESC')
-    rows = cursor.fetchall()
-    conn.close()
+async def list_profiles(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """List profiles, newest first"""
+    async with app.state.read_pool.acquire() as conn:
+        cursor = await conn.execute(
+            'SELECT user_id, name, profession, skills, created_at FROM profiles ORDER BY created_at DESC LIMIT ? OFFSET ?',
+            (limit, offset)
+        )
+        rows = await cursor.fetchall()
     
     profiles = [
         {
-            "user_id": row[0],
-            "name": row[1],
-            "profession": row[2],
-            "skills": json.loads(row[3] or "[]")[:5],  
-            "created_at": row[4]
+            "user_id": row["user_id"],
+            "name": row["name"],
+            "profession": row["profession"],
+            "skills": orjson.loads(row["skills"] or "[]")[:5],  
+            "created_at": row["created_at"]
         }
         for row in rows
     ]
     
     return {"success": True, "data": profiles}
 
+@app.post("/reanalyze/{user_id}")
+async def reanalyze_profile(user_id: str, background_tasks: BackgroundTasks):
+    """Schedule background re-analysis of a profile's portfolio images"""
+    async with app.state.read_pool.acquire() as conn:
+        cursor = await conn.execute('SELECT id, portfolio_items FROM profiles WHERE user_id = ?', (user_id,))
+        profile_row = await cursor.fetchone()
+    
+    if not profile_row:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    items = [
+        {"index": index, "media_url": item["media_url"]}
+        for index, item in enumerate(orjson.loads(profile_row["portfolio_items"] or "[]"))
+        if item.get("media_type") == "image" and item.get("media_url")
+    ]
+    background_tasks.add_task(app.state.profile_service.reanalyze_portfolio, profile_row["id"], items)
+    
+    return {"success": True, "message": "Re-analysis scheduled", "data": {"items": len(items)}}
+
 @app.post("/analyze-image")
 async def analyze_image(file: UploadFile = File(...)):
     """Analyze uploaded image"""
     try:
         contents = await file.read()
-        analysis = await profile_service.ai_service.analyze_image(contents)
+        analysis = await app.state.ai.analyze_image(contents, deadline="interactive")
         return {"success": True, "data": analysis}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Each worker process opens its own connections in the lifespan
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    )
\ No newline at end of file
